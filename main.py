@@ -1,32 +1,110 @@
 import sys
 import json
-import shutil
+from collections import deque
+from itertools import islice
 from pathlib import Path
 
 from PyQt5 import QtCore, QtWidgets, QtGui
 import fitz  # PyMuPDF
 
+try:
+    import orjson  # optional: much faster TOC import/export
+except ImportError:
+    orjson = None
+
+
+def _parse_page(text):
+    """Parse a page cell: an int, a validated 'start-end' range, else 1."""
+    text = str(text).strip()
+    if "-" in text:
+        try:
+            start, end = map(int, text.split("-"))
+            return f"{start}-{end}"
+        except Exception:
+            return 1
+    try:
+        return int(text)
+    except Exception:
+        return 1
+
 
 class TocItemWidget(QtWidgets.QTreeWidgetItem):
     def __init__(self, title, page):
+        # Set before super().__init__ in case Qt routes the initial cell
+        # values through our setData override
+        self._page_cache = None
         super().__init__([title, str(page)])
         self.setFlags(self.flags() | QtCore.Qt.ItemIsEditable | QtCore.Qt.ItemIsDragEnabled | QtCore.Qt.ItemIsDropEnabled)
+        # Subtree rows not yet built as child items: [rel_level, title, page]
+        # with rel_level 1 for an immediate child. Materialized on first
+        # expand; empty once (or if nothing was) deferred.
+        self.deferred_rows = []
 
     def title(self):
         return self.text(0)
 
+    def setData(self, column, role, value):
+        if column == 1:
+            self._page_cache = None
+        super().setData(column, role, value)
+
     def page(self):
-        text = self.text(1).strip()
-        if "-" in text:
-            try:
-                start, end = map(int, text.split("-"))
-                return f"{start}-{end}"
-            except Exception:
-                return 1
+        # tree_to_toc hits this per node per snapshot, so cache the parse
+        # until the page cell changes
+        if self._page_cache is None:
+            self._page_cache = _parse_page(self.text(1))
+        return self._page_cache
+
+
+class TocTreeWidget(QtWidgets.QTreeWidget):
+    """QTreeWidget that flags in-flight internal drags.
+
+    One internal move fires several rowsRemoved/rowsInserted/rowsMoved
+    signals while Qt performs the drop. drag_active lets the editor ignore
+    all of them and take exactly one snapshot from the dropped signal.
+    """
+
+    dropped = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.drag_active = False
+
+    def dragEnterEvent(self, event):
+        self.drag_active = True
+        super().dragEnterEvent(event)
+
+    def dragLeaveEvent(self, event):
+        self.drag_active = False
+        super().dragLeaveEvent(event)
+
+    def dropEvent(self, event):
         try:
-            return int(text)
-        except Exception:
-            return 1
+            super().dropEvent(event)
+        finally:
+            self.drag_active = False
+            self.dropped.emit()
+
+
+class PdfSaveWorker(QtCore.QRunnable):
+    """Runs a PDF write off the GUI thread, reporting back via signals."""
+
+    class Signals(QtCore.QObject):
+        finished = QtCore.pyqtSignal(str)
+        error = QtCore.pyqtSignal(str)
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+        self.signals = PdfSaveWorker.Signals()
+
+    def run(self):
+        try:
+            message = self.job()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(message)
 
 
 class PDFTocEditor(QtWidgets.QMainWindow):
@@ -40,12 +118,34 @@ class PDFTocEditor(QtWidgets.QMainWindow):
 
         self.pdf_path = None
         self.doc = None
-
-        # Undo/Redo stacks
-        self.undo_stack = []
-        self.redo_stack = []
+        self._save_worker = None  # in-flight PDF write, if any
+
+        # Undo/Redo history. _current_snapshot mirrors what the tree holds
+        # as parallel (levels, titles, pages) columns; the stacks store
+        # (start, old_cols, new_cols) deltas between consecutive snapshots
+        # instead of full copies, so memory grows with the size of each edit
+        # rather than the size of the whole TOC. The maxlen bounds history
+        # depth: once full, the oldest delta is evicted in O(1).
+        self.undo_limit = 200
+        self._current_snapshot = None
+        self.undo_stack = deque(maxlen=self.undo_limit)
+        self.redo_stack = deque(maxlen=self.undo_limit)
+        # Cheap change detection: every change signal bumps _toc_version, and
+        # a snapshot records the version it captured. A commit whose version
+        # is already captured returns without walking the tree at all.
+        self._toc_version = 0
+        self._snapshot_version = 0
         self.is_restoring = False  # Prevent recursion
 
+        # Coalesce bursts of change signals (each keystroke of a cell edit,
+        # the several model signals of one drag-drop) into a single snapshot:
+        # the signal slot only restarts this timer, the real work runs on
+        # timeout. Anything that needs an up-to-date history flushes first.
+        self._undo_timer = QtCore.QTimer(self)
+        self._undo_timer.setSingleShot(True)
+        self._undo_timer.setInterval(300)
+        self._undo_timer.timeout.connect(self._commit_undo_state)
+
         central = QtWidgets.QWidget()
         self.setCentralWidget(central)
         layout = QtWidgets.QVBoxLayout(central)
@@ -53,18 +153,18 @@ class PDFTocEditor(QtWidgets.QMainWindow):
         toolbar = QtWidgets.QHBoxLayout()
         layout.addLayout(toolbar)
 
-        open_btn = QtWidgets.QPushButton('Open PDF')
-        open_btn.clicked.connect(self.open_pdf)
-        toolbar.addWidget(open_btn)
+        self.open_btn = QtWidgets.QPushButton('Open PDF')
+        self.open_btn.clicked.connect(self.open_pdf)
+        toolbar.addWidget(self.open_btn)
 
-        save_btn = QtWidgets.QPushButton('Save to PDF')
-        save_btn.clicked.connect(self.save_pdf)
-        toolbar.addWidget(save_btn)
+        self.save_btn = QtWidgets.QPushButton('Save to PDF')
+        self.save_btn.clicked.connect(self.save_pdf)
+        toolbar.addWidget(self.save_btn)
 
         # Add Save As button
-        save_as_btn = QtWidgets.QPushButton('Save As...')
-        save_as_btn.clicked.connect(self.save_pdf_as)
-        toolbar.addWidget(save_as_btn)
+        self.save_as_btn = QtWidgets.QPushButton('Save As...')
+        self.save_as_btn.clicked.connect(self.save_pdf_as)
+        toolbar.addWidget(self.save_as_btn)
 
         import_btn = QtWidgets.QPushButton('Import (.json)')
         import_btn.clicked.connect(self.import_toc)
@@ -87,9 +187,12 @@ class PDFTocEditor(QtWidgets.QMainWindow):
         splitter = QtWidgets.QSplitter(QtCore.Qt.Horizontal)
         layout.addWidget(splitter)
 
-        self.tree = QtWidgets.QTreeWidget()
+        self.tree = TocTreeWidget()
         self.tree.setColumnCount(2)
         self.tree.setHeaderLabels(['Title', 'Page'])
+        # All rows are single-line text; telling the view so lets it compute
+        # layout/scroll geometry arithmetically instead of measuring each row.
+        self.tree.setUniformRowHeights(True)
         self.tree.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
         self.tree.setEditTriggers(QtWidgets.QAbstractItemView.DoubleClicked | QtWidgets.QAbstractItemView.SelectedClicked)
         self.tree.setColumnWidth(0, 400)
@@ -135,37 +238,192 @@ class PDFTocEditor(QtWidgets.QMainWindow):
         self.tree.model().rowsInserted.connect(self.save_undo_state)
         self.tree.model().rowsRemoved.connect(self.save_undo_state)
         self.tree.model().rowsMoved.connect(self.save_undo_state)
+        self.tree.dropped.connect(self.save_undo_state)
+
+        # Lazy subtree construction (see populate_tree_from_toc)
+        self.tree.itemExpanded.connect(self._materialize_children)
 
     # --- Undo/Redo logic ---
 
     def save_undo_state(self, *args, **kwargs):
+        if self.is_restoring or self.tree.drag_active:
+            return
+        self._toc_version += 1
+        self._undo_timer.start()
+
+    def _flush_undo_state(self):
+        """Commit any pending debounced snapshot immediately."""
+        self._undo_timer.stop()
+        self._commit_undo_state()
+
+    def _commit_undo_state(self):
         if self.is_restoring:
             return
-        toc = self.tree_to_toc()
-        if not self.undo_stack or self.undo_stack[-1] != toc:
-            self.undo_stack.append(json.loads(json.dumps(toc)))  # Deep copy
-            self.redo_stack.clear()
+        if self._toc_version == self._snapshot_version:
+            return
+        self._snapshot_version = self._toc_version
+        snapshot = self._tree_snapshot()
+        if self._current_snapshot is None:
+            # First snapshot: just establish the baseline
+            self._current_snapshot = snapshot
+            return
+        delta = self._diff_snapshots(self._current_snapshot, snapshot)
+        if delta is None:
+            return
+        self.undo_stack.append(delta)
+        self.redo_stack.clear()
+        self._current_snapshot = snapshot
+
+    @staticmethod
+    def _diff_snapshots(old, new):
+        """Diff two SoA snapshots into a (start, old_cols, new_cols) delta.
+
+        old_cols/new_cols are (levels, titles, pages) slices covering only
+        the changed region; the common prefix and suffix are excluded.
+        Returns None if the snapshots are equal, which the column-wise ==
+        detects at C speed without visiting rows individually.
+        """
+        if old == new:
+            return None
+        old_levels, old_titles, old_pages = old
+        new_levels, new_titles, new_pages = new
+        start = 0
+        limit = min(len(old_levels), len(new_levels))
+        while (start < limit
+               and old_levels[start] == new_levels[start]
+               and old_titles[start] == new_titles[start]
+               and old_pages[start] == new_pages[start]):
+            start += 1
+        end_old, end_new = len(old_levels), len(new_levels)
+        while (end_old > start and end_new > start
+               and old_levels[end_old - 1] == new_levels[end_new - 1]
+               and old_titles[end_old - 1] == new_titles[end_new - 1]
+               and old_pages[end_old - 1] == new_pages[end_new - 1]):
+            end_old -= 1
+            end_new -= 1
+        return (start,
+                tuple(col[start:end_old] for col in old),
+                tuple(col[start:end_new] for col in new))
 
     def restore_toc_state(self, toc):
+        # Remember which rows were expanded (by flat index) so a rebuild
+        # does not collapse the whole view
+        expanded = {i for i, (item, _level, _title, _page)
+                    in enumerate(self._iter_flat_rows())
+                    if item is not None and item.isExpanded()}
         self.is_restoring = True
-        self.populate_tree_from_toc(toc)
-        self.is_restoring = False
+        try:
+            self.populate_tree_from_toc(toc)
+            if expanded:
+                self.tree.setUpdatesEnabled(False)
+                try:
+                    self._restore_expanded(expanded)
+                finally:
+                    self.tree.setUpdatesEnabled(True)
+        finally:
+            self.is_restoring = False
+
+    def _restore_expanded(self, expanded):
+        """Re-expand rows recorded by flat index before a rebuild.
+
+        One pass in _iter_flat_rows order; expanding a node materializes its
+        deferred children, which makes the deeper recorded rows reachable as
+        the walk gets to them. Rows still deferred (their parent stays
+        collapsed) are skipped by count.
+        """
+        idx = 0
+        stack = [self.tree.topLevelItem(i)
+                 for i in range(self.tree.topLevelItemCount() - 1, -1, -1)]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, int):
+                # deferred row count of a collapsed subtree
+                idx += node
+                continue
+            if idx in expanded:
+                node.setExpanded(True)
+            idx += 1
+            if node.deferred_rows:
+                stack.append(len(node.deferred_rows))
+            for i in range(node.childCount() - 1, -1, -1):
+                stack.append(node.child(i))
+
+    def _apply_delta(self, start, removed_cols, inserted_cols, snapshot):
+        """Apply one undo/redo step to the widget tree.
+
+        A delta that only rewrites cell text (identical levels columns) is
+        patched in place on the affected items; anything structural falls
+        back to a full rebuild from the snapshot. Undoing a cell edit in a
+        large TOC therefore touches one item instead of reallocating all of
+        them.
+        """
+        count = len(inserted_cols[0])
+        in_place = removed_cols[0] == inserted_cols[0]
+        targets = None
+        if in_place:
+            targets = list(islice(self._iter_flat_rows(), start, start + count))
+            if any(item is None for item, _level, _title, _page in targets):
+                # The rows live inside a subtree that was never materialized
+                in_place = False
+        if not in_place:
+            self.restore_toc_state(list(zip(*snapshot)))
+            return
+        self.is_restoring = True
+        try:
+            for (item, _level, _title, _page), title, page in zip(
+                    targets, inserted_cols[1], inserted_cols[2]):
+                item.setText(0, str(title))
+                item.setText(1, str(page))
+        finally:
+            self.is_restoring = False
+
+    def _iter_flat_rows(self):
+        """Yield (item, level, title, page) per TOC row in depth-first order.
+
+        Rows of a subtree that has not been materialized yet are yielded
+        straight from the owner's deferred_rows with item None.
+        """
+        stack = [(self.tree.topLevelItem(i), 1)
+                 for i in range(self.tree.topLevelItemCount() - 1, -1, -1)]
+        while stack:
+            item, level = stack.pop()
+            if isinstance(item, list):
+                # deferred rows, flushed after their owner's real children
+                for rel, title, page in item:
+                    yield None, level + rel, title, page
+                continue
+            yield item, level, item.title(), item.page()
+            if item.deferred_rows:
+                stack.append((item.deferred_rows, level))
+            for i in range(item.childCount() - 1, -1, -1):
+                stack.append((item.child(i), level + 1))
 
     def undo(self):
-        if len(self.undo_stack) < 2:
+        self._flush_undo_state()
+        if not self.undo_stack:
             return
-        current = self.undo_stack.pop()
-        self.redo_stack.append(current)
-        prev = self.undo_stack[-1]
-        self.restore_toc_state(prev)
+        delta = self.undo_stack.pop()
+        start, old_cols, new_cols = delta
+        new_len = len(new_cols[0])
+        snapshot = tuple(col[:start] + old_col + col[start + new_len:]
+                         for col, old_col in zip(self._current_snapshot, old_cols))
+        self.redo_stack.append(delta)
+        self._current_snapshot = snapshot
+        self._apply_delta(start, new_cols, old_cols, snapshot)
         self.status.showMessage('Undo')
 
     def redo(self):
+        self._flush_undo_state()
         if not self.redo_stack:
             return
-        next_state = self.redo_stack.pop()
-        self.undo_stack.append(next_state)
-        self.restore_toc_state(next_state)
+        delta = self.redo_stack.pop()
+        start, old_cols, new_cols = delta
+        old_len = len(old_cols[0])
+        snapshot = tuple(col[:start] + new_col + col[start + old_len:]
+                         for col, new_col in zip(self._current_snapshot, new_cols))
+        self.undo_stack.append(delta)
+        self._current_snapshot = snapshot
+        self._apply_delta(start, old_cols, new_cols, snapshot)
         self.status.showMessage('Redo')
 
     # --- End Undo/Redo logic ---
@@ -177,6 +435,11 @@ class PDFTocEditor(QtWidgets.QMainWindow):
         self.load_pdf(path)
 
     def load_pdf(self, path):
+        if self._save_worker is not None:
+            # A worker is still writing self.doc; swapping documents now
+            # would hand the stale TOC to the wrong file
+            self.status.showMessage('Still saving — try again when the save finishes.')
+            return
         try:
             doc = fitz.open(path)
         except Exception as e:
@@ -193,49 +456,105 @@ class PDFTocEditor(QtWidgets.QMainWindow):
         self.status.showMessage(f'Loaded: {path} — pages: {len(doc)} — toc entries: {len(toc)}')
 
     def populate_tree_from_toc(self, toc):
-        self.tree.clear()
-        if not toc:
-            return
-
-        stack = []
-        for entry in toc:
-            try:
-                level, title, page = entry[:3]
-            except Exception:
-                continue
-            item = TocItemWidget(title, page)
-            if level <= 1:
-                self.tree.addTopLevelItem(item)
-                stack = [item]
-            else:
-                parent_level_index = level - 2
-                if parent_level_index < len(stack):
-                    parent = stack[parent_level_index]
-                    parent.addChild(item)
-                    if len(stack) >= level:
-                        stack[level - 1:level] = [item]
-                    else:
-                        stack.append(item)
+        # Bulk load: suppress repaints, widget signals (itemChanged etc.) and
+        # sorting for the duration of the rebuild, so Qt lays out and paints
+        # the tree once instead of once per row.
+        self.tree.setUpdatesEnabled(False)
+        self.tree.blockSignals(True)
+        sorting = self.tree.isSortingEnabled()
+        self.tree.setSortingEnabled(False)
+        try:
+            self.tree.clear()
+            if not toc:
+                return
+
+            # Materialize only the top level; each root keeps its subtree as
+            # raw deferred rows (levels re-based so an immediate child is 1)
+            # and builds child items on first expand. As before, a row whose
+            # level skips past the current nesting depth is promoted to a new
+            # top-level entry.
+            tops = []
+            root = None
+            depth = 0
+            for entry in toc:
+                try:
+                    level, title, page = entry[:3]
+                except Exception:
+                    continue
+                if level <= 1 or level - 2 >= depth:
+                    root = TocItemWidget(title, page)
+                    tops.append(root)
+                    depth = 1
                 else:
-                    self.tree.addTopLevelItem(item)
-                    stack = [item]
+                    root.deferred_rows.append([level - 1, str(title), _parse_page(page)])
+                    if depth < level:
+                        depth = level
+            for top in tops:
+                if top.deferred_rows:
+                    top.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.ShowIndicator)
+            self.tree.addTopLevelItems(tops)
+        finally:
+            self.tree.setSortingEnabled(sorting)
+            self.tree.blockSignals(False)
+            self.tree.setUpdatesEnabled(True)
         # Save state after loading
         if not self.is_restoring:
             self.save_undo_state()
 
     def tree_to_toc(self):
-        toc = []
-        def recurse(node, level):
-            for i in range(node.childCount()):
-                child = node.child(i)
-                toc.append([level, child.title(), child.page()])
-                recurse(child, level + 1)
-
-        for i in range(self.tree.topLevelItemCount()):
-            top = self.tree.topLevelItem(i)
-            toc.append([1, top.title(), top.page()])
-            recurse(top, 2)
-        return toc
+        return [[level, title, page]
+                for _item, level, title, page in self._iter_flat_rows()]
+
+    def _tree_snapshot(self):
+        """Capture the TOC in SoA form: parallel (levels, titles, pages).
+
+        Three flat columns cost far less than one 3-element list per row
+        (the history keeps a full copy in _current_snapshot), and snapshot
+        equality short-circuits on whole-column == instead of comparing
+        row by row.
+        """
+        levels, titles, pages = [], [], []
+        for _item, level, title, page in self._iter_flat_rows():
+            levels.append(level)
+            titles.append(title)
+            pages.append(page)
+        return (levels, titles, pages)
+
+    def _snapshot_toc(self):
+        """Return the current TOC as rows without re-walking the tree.
+
+        Flushes any pending snapshot first; after that _current_snapshot
+        mirrors the tree exactly, so consumers (export, PDF save) only pay
+        for zipping the columns back into rows, not for Qt traversal.
+        """
+        self._flush_undo_state()
+        if self._current_snapshot is not None:
+            return [[level, title, page] for level, title, page
+                    in zip(*self._current_snapshot)]
+        return self.tree_to_toc()
+
+    def _materialize_children(self, item):
+        """Build the immediate children of an item from its deferred rows.
+
+        Each new child takes over its own sub-rows (re-based one level) so
+        deeper levels stay deferred until they are expanded themselves.
+        """
+        rows = item.deferred_rows
+        if not rows:
+            return
+        item.deferred_rows = []
+        children = []
+        child = None
+        for rel, title, page in rows:
+            if rel <= 1 or child is None:
+                child = TocItemWidget(title, page)
+                children.append(child)
+            else:
+                child.deferred_rows.append([rel - 1, title, page])
+        for c in children:
+            if c.deferred_rows:
+                c.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.ShowIndicator)
+        item.addChildren(children)
 
     def add_item(self, child=False):
         sel = self.tree.currentItem()
@@ -247,6 +566,9 @@ class PDFTocEditor(QtWidgets.QMainWindow):
         if parent is None:
             self.tree.addTopLevelItem(item)
         else:
+            # Build any deferred children first so the new item lands after
+            # its existing siblings
+            self._materialize_children(parent)
             parent.addChild(item)
             parent.setExpanded(True)
         self.tree.setCurrentItem(item)
@@ -287,27 +609,18 @@ class PDFTocEditor(QtWidgets.QMainWindow):
             idx = self.tree.indexOfTopLevelItem(item)
             new_idx = idx + direction
             if 0 <= new_idx < self.tree.topLevelItemCount():
-                item_clone = self.clone_item(item)
-                self.tree.takeTopLevelItem(idx)
-                self.tree.insertTopLevelItem(new_idx, item_clone)
-                self.tree.setCurrentItem(item_clone)
+                taken = self.tree.takeTopLevelItem(idx)
+                self.tree.insertTopLevelItem(new_idx, taken)
+                self.tree.setCurrentItem(taken)
         else:
             idx = parent.indexOfChild(item)
             new_idx = idx + direction
             if 0 <= new_idx < parent.childCount():
-                clone = self.clone_item(item)
-                parent.takeChild(idx)
-                parent.insertChild(new_idx, clone)
-                self.tree.setCurrentItem(clone)
+                taken = parent.takeChild(idx)
+                parent.insertChild(new_idx, taken)
+                self.tree.setCurrentItem(taken)
         self.save_undo_state()
 
-    def clone_item(self, item):
-        clone = TocItemWidget(item.title(), item.page())
-        for i in range(item.childCount()):
-            child = item.child(i)
-            clone.addChild(self.clone_item(child))
-        return clone
-
     def export_toc(self):
         if self.tree.topLevelItemCount() == 0:
             QtWidgets.QMessageBox.information(self, 'Export', 'No TOC entries to export.')
@@ -315,9 +628,13 @@ class PDFTocEditor(QtWidgets.QMainWindow):
         path, _ = QtWidgets.QFileDialog.getSaveFileName(self, 'Export TOC JSON', '', 'JSON files (*.json)')
         if not path:
             return
-        toc = self.tree_to_toc()
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(toc, f, indent=2, ensure_ascii=False)
+        toc = self._snapshot_toc()
+        if orjson is not None:
+            with open(path, 'wb') as f:
+                f.write(orjson.dumps(toc, option=orjson.OPT_INDENT_2))
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(toc, f, indent=2, ensure_ascii=False)
         self.status.showMessage(f'Exported TOC to {path}')
 
     def import_toc(self):
@@ -325,36 +642,49 @@ class PDFTocEditor(QtWidgets.QMainWindow):
         if not path:
             return
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                toc = json.load(f)
+            if orjson is not None:
+                with open(path, 'rb') as f:
+                    toc = orjson.loads(f.read())
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    toc = json.load(f)
             self.populate_tree_from_toc(toc)
             self.status.showMessage(f'Imported TOC from {path}')
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, 'Error', f'Could not import TOC:\n{e}')
 
-    def save_pdf(self):
-        if self.doc is None or self.pdf_path is None:
-            QtWidgets.QMessageBox.information(self, 'Save', 'Open a PDF first.')
-            return
-        # Save directly to the opened PDF
-        toc = self.tree_to_toc()
+    def _build_py_toc(self, toc):
+        """Convert a TOC snapshot into the (level, title, page) tuples that
+        fitz.Document.set_toc expects.
+
+        Page cells come out of TocItemWidget.page() as either an int or a
+        validated 'start-end' range string; only the start page of a range
+        can be stored in the PDF, so that is what is kept.
+        """
         py_toc = []
         for level, title, page in toc:
-            if isinstance(page, str) and "-" in str(page):
+            if isinstance(page, str) and "-" in page:
                 try:
-                    start, end = map(int, str(page).split("-"))
-                    py_toc.append((int(level), str(title), int(start)))
+                    page = int(page.split("-")[0])
                 except Exception:
                     continue
-            else:
-                py_toc.append((int(level), str(title), int(page)))
-        try:
-            self.doc.set_toc(py_toc)
-            self.doc.saveIncr()
-            self.status.showMessage(f'Saved TOC to opened PDF')
-            QtWidgets.QMessageBox.information(self, 'Saved', f'Saved TOC to opened PDF.')
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, 'Error', f'Could not save PDF:\n{e}')
+            py_toc.append((int(level), str(title), int(page)))
+        return py_toc
+
+    def save_pdf(self):
+        if self.doc is None or self.pdf_path is None:
+            QtWidgets.QMessageBox.information(self, 'Save', 'Open a PDF first.')
+            return
+        # Save directly to the opened PDF. Bind the document now so the
+        # worker never touches a document opened after dispatch.
+        py_toc = self._build_py_toc(self._snapshot_toc())
+        doc = self.doc
+
+        def job():
+            doc.set_toc(py_toc)
+            doc.saveIncr()
+            return 'Saved TOC to opened PDF'
+        self._start_pdf_save(job)
 
     def save_pdf_as(self):
         if self.doc is None or self.pdf_path is None:
@@ -363,37 +693,62 @@ class PDFTocEditor(QtWidgets.QMainWindow):
         path, _ = QtWidgets.QFileDialog.getSaveFileName(self, 'Save PDF As', '', 'PDF files (*.pdf)')
         if not path:
             return
-        toc = self.tree_to_toc()
-        py_toc = []
-        for level, title, page in toc:
-            if isinstance(page, str) and "-" in str(page):
-                try:
-                    start, end = map(int, str(page).split("-"))
-                    py_toc.append((int(level), str(title), int(start)))
-                except Exception:
-                    continue
-            else:
-                py_toc.append((int(level), str(title), int(page)))
-        try:
-            # Copy original PDF to new path, then set TOC
-            shutil.copyfile(self.pdf_path, path)
-            doc = fitz.open(path)
+        py_toc = self._build_py_toc(self._snapshot_toc())
+        doc = self.doc
+
+        # doc.save cannot target the file the document was opened from;
+        # writing onto the original is just an incremental save.
+        same_file = Path(path).resolve() == Path(self.pdf_path).resolve()
+
+        def job():
+            # Write straight from the already-parsed document: one parse,
+            # one write, no intermediate file copy or re-open. The document
+            # stays open so the user can keep editing.
             doc.set_toc(py_toc)
-            doc.saveIncr()
-            doc.close()
-            self.status.showMessage(f'Saved TOC to {path}')
-            QtWidgets.QMessageBox.information(self, 'Saved', f'Saved TOC to {path}.')
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, 'Error', f'Could not save PDF:\n{e}')
+            if same_file:
+                doc.saveIncr()
+            else:
+                doc.save(path)
+            return f'Saved TOC to {path}'
+        self._start_pdf_save(job)
+
+    def _start_pdf_save(self, job):
+        """Run a PDF write on the global thread pool.
+
+        The Save and Open buttons are disabled while a write is in flight;
+        only one write runs at a time and the document cannot be replaced
+        under it, so the worker has exclusive use of the document. Results
+        come back on the GUI thread via queued signal delivery.
+        """
+        self.open_btn.setEnabled(False)
+        self.save_btn.setEnabled(False)
+        self.save_as_btn.setEnabled(False)
+        worker = PdfSaveWorker(job)
+        worker.signals.finished.connect(self._pdf_save_finished)
+        worker.signals.error.connect(self._pdf_save_failed)
+        self._save_worker = worker  # keep signals alive until done
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def _pdf_save_finished(self, message):
+        self._save_worker = None
+        self.open_btn.setEnabled(True)
+        self.save_btn.setEnabled(True)
+        self.save_as_btn.setEnabled(True)
+        self.status.showMessage(message)
+        QtWidgets.QMessageBox.information(self, 'Saved', f'{message}.')
+
+    def _pdf_save_failed(self, message):
+        self._save_worker = None
+        self.open_btn.setEnabled(True)
+        self.save_btn.setEnabled(True)
+        self.save_as_btn.setEnabled(True)
+        QtWidgets.QMessageBox.critical(self, 'Error', f'Could not save PDF:\n{message}')
 
     def eventFilter(self, obj, event):
         if obj == self.tree and event.type() == QtCore.QEvent.KeyPress:
             # Ctrl+A: select all
             if event.key() == QtCore.Qt.Key_A and event.modifiers() & QtCore.Qt.ControlModifier:
-                self.tree.clearSelection()
-                for i in range(self.tree.topLevelItemCount()):
-                    item = self.tree.topLevelItem(i)
-                    self.select_all_recursive(item)
+                self.select_all_items()
                 return True
             # Delete key: delete selected
             if event.key() == QtCore.Qt.Key_Delete:
@@ -409,10 +764,29 @@ class PDFTocEditor(QtWidgets.QMainWindow):
                 return True
         return super().eventFilter(obj, event)
 
-    def select_all_recursive(self, item):
-        item.setSelected(True)
-        for i in range(item.childCount()):
-            self.select_all_recursive(item.child(i))
+    def select_all_items(self):
+        """Select every item (including collapsed ones) in one operation.
+
+        setSelected(True) per item emits selectionChanged each time; building
+        one QItemSelection with a range per sibling group and handing it to
+        the selection model keeps that to a single update.
+        """
+        model = self.tree.model()
+        selection = QtCore.QItemSelection()
+        stack = [QtCore.QModelIndex()]
+        while stack:
+            parent = stack.pop()
+            rows = model.rowCount(parent)
+            if not rows:
+                continue
+            selection.append(QtCore.QItemSelectionRange(
+                model.index(0, 0, parent),
+                model.index(rows - 1, model.columnCount(parent) - 1, parent)))
+            for row in range(rows):
+                stack.append(model.index(row, 0, parent))
+        self.tree.selectionModel().select(
+            selection,
+            QtCore.QItemSelectionModel.ClearAndSelect | QtCore.QItemSelectionModel.Rows)
 
 
 def main():